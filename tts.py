@@ -1,7 +1,8 @@
 """
 Chat-Style TTS Panel (Windows/macOS/Linux)
 - Tkinter GUI with chat transcript
-- pyttsx3 per-utterance engine to avoid 'only speaks once' issues on Windows
+- pyttsx3 runs in a persistent child process (tts_service.py) fed over pipes,
+  so driver stalls never block the GUI
 - Enter to send & speak; Shift+Enter = newline
 - Keeps history; can replay, stop, delete selected, export transcript
 - No extra system installs required (besides `pip install pyttsx3`)
@@ -13,64 +14,23 @@ Windows → Send audio to Discord without extra drivers:
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
-import pyttsx3
+import queue
+import subprocess
+import json
+import os
+import sys
 import time
-from datetime import datetime
-from dataclasses import dataclass
-
-# ------------------------ Speech worker ------------------------
-class SpeechWorker(threading.Thread):
-    def __init__(self, text: str, voice_id: str | None, rate: int, volume: float):
-        super().__init__(daemon=True)
-        self.text = text
-        self.voice_id = voice_id
-        self.rate = rate
-        self.volume = volume
-        self.stop_flag = threading.Event()
-        self.exc: Exception | None = None
-
-    def run(self):
-        engine = None
-        try:
-            engine = pyttsx3.init()
-            if self.voice_id:
-                try:
-                    engine.setProperty("voice", self.voice_id)
-                except Exception:
-                    pass
-            try:
-                engine.setProperty("rate", int(self.rate))
-            except Exception:
-                pass
-            try:
-                engine.setProperty("volume", float(self.volume))
-            except Exception:
-                pass
-
-            def on_word(name, location, length):
-                if self.stop_flag.is_set():
-                    raise SystemExit
-            engine.connect('started-word', on_word)
-
-            engine.say(self.text)
-            engine.runAndWait()
-            engine.stop()
-        except SystemExit:
-            try:
-                if engine:
-                    engine.stop()
-            except Exception:
-                pass
-        except Exception as e:
-            self.exc = e
-        finally:
-            try:
-                del engine
-            except Exception:
-                pass
-
-    def stop(self):
-        self.stop_flag.set()
+import re
+from collections import namedtuple, OrderedDict
+from dataclasses import dataclass, field
+
+# ------------------------ Speech service process ------------------------
+def _service_command() -> list[str]:
+    # frozen builds re-launch the same executable in service mode
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, '--tts-service']
+    here = os.path.dirname(os.path.abspath(__file__))
+    return [sys.executable, os.path.join(here, 'tts_service.py')]
 
 # ------------------------ Data model --------------------------
 @dataclass
@@ -78,6 +38,92 @@ class Message:
     id: int
     ts: float
     text: str
+    # HH:MM:SS shown in the transcript, formatted once per message
+    ts_short: str = field(init=False, repr=False, compare=False)
+    # formatted export line, filled on first export
+    _fmt: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.ts_short = time.strftime('%H:%M:%S', time.localtime(self.ts))
+
+    def export_line(self) -> str:
+        if self._fmt is None:
+            ts = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.ts))
+            self._fmt = f"[{self.id:03d} {ts}] {self.text}\n"
+        return self._fmt
+
+EXPORT_CHUNK = 4096  # messages formatted per write() in export_log
+
+VoiceInfo = namedtuple('VoiceInfo', 'id name languages')
+
+_ZH_RE = re.compile(r'zh|cmn|mandarin|tw|chinese', re.I)
+
+def pick_default_voice_id(voices: list[VoiceInfo]) -> str:
+    # choose a likely Chinese voice if available
+    for v in voices:
+        if _ZH_RE.search(v.name or '') or any(_ZH_RE.search(l) for l in v.languages or []):
+            return v.id
+    return voices[0].id if voices else ''
+
+# ------------------------ Voice cache -------------------------
+# Enumerating SAPI/NSSS voices can take seconds; remember the result between launches.
+# Plain JSON in a per-user directory: never unpickle anything from a shared temp dir.
+def _user_cache_dir() -> str:
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(r'~\AppData\Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'tts_tool')
+
+VOICE_CACHE_PATH = os.path.join(_user_cache_dir(), 'voices.json')
+
+def _is_number(x) -> bool:
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+def load_voice_cache() -> dict | None:
+    # any unreadable or malformed cache just means "probe again"; staleness is
+    # checked later against the key the service reports in its 'ready' event,
+    # so no package-metadata lookup runs before the first paint
+    try:
+        with open(VOICE_CACHE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get('key'), str):
+            return None
+        voices = []
+        for vid, name, langs in data['voices']:
+            if not (isinstance(vid, str) and isinstance(name, str) and isinstance(langs, list)
+                    and all(isinstance(l, str) for l in langs)):
+                return None
+            voices.append(VoiceInfo(vid, name, langs))
+        rate, volume, default_voice_id = data['rate'], data['volume'], data['default_voice_id']
+        if not ((rate is None or _is_number(rate)) and (volume is None or _is_number(volume))
+                and isinstance(default_voice_id, str)):
+            return None
+    except Exception:
+        return None
+    return {'key': data['key'], 'voices': voices, 'rate': rate, 'volume': volume,
+            'default_voice_id': default_voice_id}
+
+def save_voice_cache(key: str, voices: list[VoiceInfo], rate, volume, default_voice_id: str):
+    data = {
+        'key': key,
+        'voices': [[v.id, v.name, list(v.languages or [])] for v in voices],
+        'rate': rate,
+        'volume': volume,
+        'default_voice_id': default_voice_id,
+    }
+    try:
+        os.makedirs(os.path.dirname(VOICE_CACHE_PATH), exist_ok=True)
+        with open(VOICE_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def clear_voice_cache():
+    try:
+        os.remove(VOICE_CACHE_PATH)
+    except OSError:
+        pass
 
 # ------------------------ Main App ----------------------------
 class ChatTTSApp(tk.Tk):
@@ -87,43 +133,45 @@ class ChatTTSApp(tk.Tk):
         self.geometry("760x560")
         self.minsize(680, 520)
 
-        # one-shot probe engine to get defaults & voices
-        try:
-            _tmp = pyttsx3.init()
-            self.voices = _tmp.getProperty("voices") or []
-            self.default_rate = _tmp.getProperty("rate") or 180
-            self.default_volume = _tmp.getProperty("volume") or 1.0
-            # choose a likely Chinese voice if available
-            default_voice = None
-            for v in self.voices:
-                name = (getattr(v, 'name', '') or '').lower()
-                langs = ','.join(getattr(v, 'languages', []) or []).lower()
-                if any(k in (name + ' ' + langs) for k in ['zh', 'cmn', 'mandarin', 'tw', 'chinese']):
-                    default_voice = v
-                    break
-            if default_voice is None and self.voices:
-                default_voice = self.voices[0]
-            self.default_voice_id = default_voice.id if default_voice else ''
-            try:
-                _tmp.stop()
-            except Exception:
-                pass
-            del _tmp
-        except Exception as e:
-            messagebox.showerror("初始化失敗", f"無法初始化系統語音：\n{e}")
+        # voices come from the disk cache; without one, the UI starts empty and
+        # the service's probe reply fills it in once the window is up
+        cached = load_voice_cache()
+        if cached:
+            self.voices = cached['voices']
+            self.default_rate = cached['rate'] or 180
+            self.default_volume = cached['volume'] or 1.0
+            self.default_voice_id = cached['default_voice_id']
+        else:
             self.voices = []
             self.default_rate = 180
             self.default_volume = 1.0
             self.default_voice_id = ''
+        self._initial_probe = cached is None
+        self._cache_key = cached['key'] if cached else None
+        self._service_key: str | None = None  # from the service's 'ready' event
 
         # state
-        self.messages: list[Message] = []
+        # keyed by message id, in send order: O(1) lookup and delete
+        self.messages: OrderedDict[int, Message] = OrderedDict()
         self.auto_speak_var = tk.BooleanVar(value=True)
-        self.current_worker: SpeechWorker | None = None
+        self.current_say_id = 0
+        self._speaking = False
+        self._last_spoken: tuple | None = None  # (text, voice_id, rate, volume)
         self.next_id = 1
-
-        # build UI
+        # updates from worker threads; they only put() here, the Tk thread
+        # drains it every 50ms, but only while a reply is actually pending
+        self._ui_queue: queue.Queue = queue.Queue()
+        self._ui_polling = False
+        self._say_in_flight = False  # current say not yet done/stopped/error
+        self._probing = False        # voices probe or rescan awaiting its reply
+        self._awaiting_ready = False  # service started, 'ready' (cache key) not yet seen
+        self._bg_jobs = 0
+
+        # build UI first; the speech service is spawned only once the window
+        # has been mapped and drawn, so Popen never delays the first paint
+        self.proc: subprocess.Popen | None = None
         self._build_ui()
+        self._map_bind = self.bind('<Map>', self._on_first_map, add='+')
         self.after(150, lambda: self.txt_input.focus_set())
 
     # -------------------- UI --------------------
@@ -134,34 +182,23 @@ class ChatTTSApp(tk.Tk):
 
         ttk.Label(top, text='語者/Voice：').grid(row=0, column=0, sticky='w')
         self.cmb_voice = ttk.Combobox(top, state='readonly', width=40)
-        voice_display = []
-        for v in self.voices:
-            label = getattr(v, 'name', v.id)
-            langs = getattr(v, 'languages', [])
-            if langs:
-                label += f"  ({', '.join(langs)})"
-            voice_display.append((label, v.id))
-        self.cmb_voice['values'] = [label for (label, _id) in voice_display]
         self.cmb_voice.grid(row=0, column=1, sticky='ew', padx=(6, 12))
-        if voice_display:
-            # select default
-            idx = 0
-            for i, (_, vid) in enumerate(voice_display):
-                if vid == self.default_voice_id:
-                    idx = i
-                    break
-            self.cmb_voice.current(idx)
+        self._populate_voice_combo(self.default_voice_id)
         top.columnconfigure(1, weight=1)
 
         ttk.Label(top, text='語速：').grid(row=0, column=2, sticky='w')
-        self.sld_rate = ttk.Scale(top, from_=80, to=260, orient='horizontal')
+        self.sld_rate = ttk.Scale(top, from_=80, to=260, orient='horizontal', command=self._on_rate_change)
         self.sld_rate.set(self.default_rate)
         self.sld_rate.grid(row=0, column=3, sticky='ew', padx=(6, 12))
 
         ttk.Label(top, text='音量：').grid(row=0, column=4, sticky='w')
-        self.sld_volume = ttk.Scale(top, from_=0, to=100, orient='horizontal')
+        self.sld_volume = ttk.Scale(top, from_=0, to=100, orient='horizontal', command=self._on_volume_change)
         self.sld_volume.set(int(self.default_volume * 100))
         self.sld_volume.grid(row=0, column=5, sticky='ew', padx=(6, 0))
+        # command= fires on every value change (drag, click, keyboard); keep the
+        # converted values cached so _speak_text doesn't re-read the widgets
+        self._on_rate_change()
+        self._on_volume_change()
 
         top.columnconfigure(3, weight=1)
         top.columnconfigure(5, weight=1)
@@ -170,7 +207,14 @@ class ChatTTSApp(tk.Tk):
         mid = ttk.Frame(self)
         mid.pack(fill='both', expand=True, padx=12, pady=(0, 6))
 
-        self.txt_log = tk.Text(mid, wrap='word', state='disabled')
+        # row-per-message view; Treeview only lays out the rows in view
+        self.txt_log = ttk.Treeview(mid, columns=('id', 'ts', 'text'), show='headings')
+        self.txt_log.heading('id', text='#')
+        self.txt_log.heading('ts', text='時間')
+        self.txt_log.heading('text', text='內容', anchor='w')
+        self.txt_log.column('id', width=48, stretch=False, anchor='e')
+        self.txt_log.column('ts', width=72, stretch=False, anchor='center')
+        self.txt_log.column('text', width=400, stretch=True, anchor='w')
         self.txt_log.pack(fill='both', expand=True, side='left')
         self.scroll = ttk.Scrollbar(mid, command=self.txt_log.yview)
         self.scroll.pack(fill='y', side='right')
@@ -198,47 +242,94 @@ class ChatTTSApp(tk.Tk):
         self.lbl_status = ttk.Label(self, text='狀態：待命')
         self.lbl_status.pack(side='bottom', pady=(0, 6))
 
-        # context menu for log
+        # menus
+        self._build_menubar()
         self._build_log_menu()
 
+    def _populate_voice_combo(self, select_id: str | None):
+        voice_display = []
+        for v in self.voices:
+            label = v.name or v.id
+            if v.languages:
+                label += f"  ({', '.join(v.languages)})"
+            voice_display.append((label, v.id))
+        self.cmb_voice['values'] = [label for (label, _id) in voice_display]
+        if voice_display:
+            # select requested voice, else the first one
+            idx = 0
+            for i, (_, vid) in enumerate(voice_display):
+                if vid == select_id:
+                    idx = i
+                    break
+            self.cmb_voice.current(idx)
+        else:
+            self.cmb_voice.set('')
+
+    def _build_menubar(self):
+        menubar = tk.Menu(self)
+        voice_menu = tk.Menu(menubar, tearoff=0)
+        voice_menu.add_command(label='重新掃描語者', command=self.rescan_voices)
+        menubar.add_cascade(label='語音', menu=voice_menu)
+        self.config(menu=menubar)
+
     def _build_log_menu(self):
         self.menu = tk.Menu(self, tearoff=0)
         self.menu.add_command(label='重播此則', command=self._ctx_replay)
-        self.menu.add_command(label='複製選取', command=lambda: self.txt_log.event_generate('<<Copy>>'))
+        self.menu.add_command(label='複製選取', command=self._ctx_copy)
         self.menu.add_separator()
         self.menu.add_command(label='刪除此則', command=self._ctx_delete)
         self.txt_log.bind('<Button-3>', self._on_log_right_click)
 
     # -------------------- Helpers --------------------
     def _current_voice_id(self):
-        label = self.cmb_voice.get()
-        if not label or not self.voices:
+        if not self.voices:
             return None
-        for v in self.voices:
-            name = getattr(v, 'name', v.id)
-            langs = getattr(v, 'languages', [])
-            shown = name + (f"  ({', '.join(langs)})" if langs else '')
-            if shown == label:
-                return v.id
-        return self.voices[0].id if self.voices else None
+        # combobox values are built from self.voices in order; index lookup is
+        # O(1) and unambiguous even when two voices share a label
+        idx = self.cmb_voice.current()
+        return self.voices[idx].id if 0 <= idx < len(self.voices) else self.voices[0].id
 
     def _append_log(self, msg: Message):
-        ts_str = datetime.fromtimestamp(msg.ts).strftime('%H:%M:%S')
-        line = f"[{msg.id:03d} {ts_str}] {msg.text}\n"
-        self.txt_log.configure(state='normal')
-        self.txt_log.insert('end', line)
-        self.txt_log.configure(state='disabled')
-        self.txt_log.see('end')
-
-    def _replace_log_all(self, text: str):
-        self.txt_log.configure(state='normal')
-        self.txt_log.delete('1.0', 'end')
-        self.txt_log.insert('end', text)
-        self.txt_log.configure(state='disabled')
+        # rows are single-line; keep multi-line messages readable
+        row_text = ' '.join(msg.text.splitlines())
+        self.txt_log.insert('', 'end', iid=str(msg.id), values=(f"{msg.id:03d}", msg.ts_short, row_text))
+        self.txt_log.see(str(msg.id))
+
+    def _clear_log_view(self):
+        self.txt_log.delete(*self.txt_log.get_children())
 
     def _set_status(self, s: str):
+        # Tk thread only; no update_idletasks(), Tk repaints on the next idle
         self.lbl_status.config(text=f'狀態：{s}')
-        self.update_idletasks()
+
+    def _post_ui(self, kind: str, payload):
+        # safe from any thread: never calls into Tk
+        self._ui_queue.put((kind, payload))
+
+    def _start_ui_poll(self):
+        if not self._ui_polling:
+            self._ui_polling = True
+            self.after(50, self._poll_ui_queue)
+
+    def _poll_ui_queue(self):
+        while True:
+            try:
+                kind, payload = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'service':
+                self._on_service_event(payload)
+            elif kind == 'exported':
+                self._bg_jobs -= 1
+                messagebox.showinfo('匯出', f'已儲存到:\n{payload}')
+            elif kind == 'export_failed':
+                self._bg_jobs -= 1
+                messagebox.showerror('匯出失敗', f'{payload}')
+        # an idle window schedules nothing; the next request restarts the poll
+        if self._say_in_flight or self._probing or self._awaiting_ready or self._bg_jobs:
+            self.after(50, self._poll_ui_queue)
+        else:
+            self._ui_polling = False
 
     # -------------------- Actions --------------------
     def send_message(self):
@@ -247,7 +338,7 @@ class ChatTTSApp(tk.Tk):
             return
         msg = Message(id=self.next_id, ts=time.time(), text=text)
         self.next_id += 1
-        self.messages.append(msg)
+        self.messages[msg.id] = msg
         self._append_log(msg)
         # 保留內容並自動全選方便覆寫
         self.txt_input.focus_set()
@@ -257,28 +348,69 @@ class ChatTTSApp(tk.Tk):
             self._speak_text(text)
 
     def _speak_text(self, text: str):
-        # stop current if any
-        self.stop_speaking(join=False)
+        if not self.proc or self.proc.poll() is not None:
+            messagebox.showerror('朗讀失敗', '語音服務未啟動')
+            return
         voice_id = self._current_voice_id()
-        rate = int(self.sld_rate.get())
-        volume = max(0.0, min(1.0, float(self.sld_volume.get()) / 100.0))
-        worker = SpeechWorker(text, voice_id, rate, volume)
-        self.current_worker = worker
+        rate = self._cached_rate
+        volume = self._cached_volume
+        request = (text, voice_id, rate, volume)
+        # same utterance still playing (e.g. Enter mashed): let it finish
+        # instead of cutting the driver off mid-word and starting over
+        if self._speaking and request == self._last_spoken:
+            return
+        # stop current if any
+        self.stop_speaking()
+        self.current_say_id += 1
+        self._send({'cmd': 'say', 'id': self.current_say_id, 'text': text,
+                    'voice': voice_id, 'rate': rate, 'vol': volume})
+        self._speaking = True
+        self._say_in_flight = True
+        self._last_spoken = request
         self._set_status('朗讀中…')
-        worker.start()
-        self.after(120, self._poll_worker_done)
-
-    def stop_speaking(self, join=True):
-        if self.current_worker and self.current_worker.is_alive():
-            self.current_worker.stop()
-            if join:
-                self.current_worker.join(timeout=0.5)
+        self._start_ui_poll()
+
+    def stop_speaking(self):
+        self._send({'cmd': 'stop'})
+        self._speaking = False
         self._set_status('已停止')
 
     def replay_last(self):
         if not self.messages:
             return
-        self._speak_text(self.messages[-1].text)
+        self._speak_text(next(reversed(self.messages.values())).text)
+
+    def rescan_voices(self):
+        if not self.proc or self.proc.poll() is not None:
+            messagebox.showerror('掃描語者失敗', '語音服務未啟動')
+            return
+        # drop the cache and let the service re-enumerate in the background
+        clear_voice_cache()
+        self._send({'cmd': 'voices'})
+        self._probing = True
+        self._set_status('掃描語者中…')
+        self._start_ui_poll()
+
+    def _apply_voices(self, evt: dict):
+        current = self._current_voice_id()
+        self.voices = [VoiceInfo(v['id'], v['name'], v['languages']) for v in evt.get('voices', [])]
+        self.default_voice_id = pick_default_voice_id(self.voices)
+        if self._service_key:
+            self._cache_key = self._service_key
+            save_voice_cache(self._service_key, self.voices, evt.get('rate') or self.default_rate,
+                             evt.get('volume') or self.default_volume, self.default_voice_id)
+        if self._initial_probe:
+            # first launch: adopt the engine's defaults as well
+            self._initial_probe = False
+            self.default_rate = evt.get('rate') or self.default_rate
+            self.default_volume = evt.get('volume') or self.default_volume
+            self.sld_rate.set(self.default_rate)
+            self.sld_volume.set(int(self.default_volume * 100))
+            self._on_rate_change()
+            self._on_volume_change()
+        self._populate_voice_combo(current or self.default_voice_id)
+        if not self._speaking:
+            self._set_status('待命')
 
     def export_log(self):
         if not self.messages:
@@ -290,62 +422,62 @@ class ChatTTSApp(tk.Tk):
         )
         if not path:
             return
-        with open(path, 'w', encoding='utf-8') as f:
-            for m in self.messages:
-                ts = datetime.fromtimestamp(m.ts).strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"[{m.id:03d} {ts}] {m.text}\n")
-        messagebox.showinfo('匯出', f'已儲存到:\n{path}')
+        # format and write off the Tk thread so long histories don't freeze the window
+        snapshot = list(self.messages.values())
+        self._bg_jobs += 1
+        threading.Thread(target=self._export_worker, args=(path, snapshot), daemon=True).start()
+        self._start_ui_poll()
+
+    def _export_worker(self, path: str, messages: list[Message]):
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                # one write per block keeps syscalls low and peak memory bounded
+                for i in range(0, len(messages), EXPORT_CHUNK):
+                    f.write(''.join(m.export_line() for m in messages[i:i + EXPORT_CHUNK]))
+        except Exception as e:  # e.g. OSError, or UnicodeEncodeError from a lone surrogate
+            self._post_ui('export_failed', e)
+        else:
+            self._post_ui('exported', path)
 
     def clear_log(self):
         if not self.messages:
             return
         if messagebox.askyesno('清除紀錄', '確定要清除畫面上的聊天紀錄嗎？此動作不會復原。'):
             self.messages.clear()
-            self._replace_log_all('')
+            self._clear_log_view()
 
     # -------------------- Context menu handlers --------------------
     def _on_log_right_click(self, event):
+        iid = self.txt_log.identify_row(event.y)
+        if not iid:
+            return
+        if iid not in self.txt_log.selection():
+            self.txt_log.selection_set(iid)
+        self.rc_click_iid = iid
         try:
-            self.rc_click_index = self.txt_log.index(f"@{event.x},{event.y}")
             self.menu.tk_popup(event.x_root, event.y_root)
         finally:
             self.menu.grab_release()
 
     def _ctx_replay(self):
-        # try to get the line text under cursor
-        try:
-            line_start = self.txt_log.index(f"{self.rc_click_index} linestart")
-            line_end = self.txt_log.index(f"{self.rc_click_index} lineend")
-            line = self.txt_log.get(line_start, line_end)
-            # strip prefix like [001 12:34:56]
-            if ']' in line:
-                text = line.split(']', 1)[1].strip()
-            else:
-                text = line.strip()
-            if text:
-                self._speak_text(text)
-        except Exception:
-            pass
+        msg = self.messages.get(int(self.rc_click_iid))
+        if msg:
+            self._speak_text(msg.text)
+
+    def _ctx_copy(self):
+        lines = []
+        for iid in self.txt_log.selection():
+            _, ts_str, text = self.txt_log.item(iid, 'values')
+            lines.append(f"[{int(iid):03d} {ts_str}] {text}")
+        if lines:
+            self.clipboard_clear()
+            self.clipboard_append('\n'.join(lines))
 
     def _ctx_delete(self):
-        # remove from memory and UI by matching id at line head
-        try:
-            line_start = self.txt_log.index(f"{self.rc_click_index} linestart")
-            line_end = self.txt_log.index(f"{self.rc_click_index} lineend")
-            line = self.txt_log.get(line_start, line_end)
-            if line.startswith('[') and ']' in line:
-                id_part = line.split(']', 1)[0]
-                try:
-                    msg_id = int(id_part.split()[0][1:])
-                    self.messages = [m for m in self.messages if m.id != msg_id]
-                except Exception:
-                    pass
-            # remove line from UI
-            self.txt_log.configure(state='normal')
-            self.txt_log.delete(line_start, f"{line_end}+1c")
-            self.txt_log.configure(state='disabled')
-        except Exception:
-            pass
+        # remove from memory and UI by row id (= message id)
+        self.messages.pop(int(self.rc_click_iid), None)
+        if self.txt_log.exists(self.rc_click_iid):
+            self.txt_log.delete(self.rc_click_iid)
 
     # -------------------- event helpers --------------------
     def _on_enter_send(self, event):
@@ -359,33 +491,106 @@ class ChatTTSApp(tk.Tk):
         self.txt_input.insert('insert', '\n')
         return "break"
 
-    def _poll_worker_done(self):
-        w = self.current_worker
-        if not w:
+    def _on_rate_change(self, value=None):
+        self._cached_rate = int(self.sld_rate.get())
+
+    def _on_volume_change(self, value=None):
+        self._cached_volume = max(0.0, min(1.0, float(self.sld_volume.get()) / 100.0))
+
+    # -------------------- service IPC --------------------
+    def _on_first_map(self, event):
+        # children's <Map> events also reach the toplevel's bindings
+        if event.widget is not self:
             return
-        if w.is_alive():
-            self.after(120, self._poll_worker_done)
-        else:
-            if w.exc:
-                messagebox.showerror('朗讀失敗', f'{w.exc}')
-            self.current_worker = None
-            self._set_status('待命')
+        self.unbind('<Map>', self._map_bind)
+        # the redraws queued by mapping run as idle handlers ahead of this one
+        self.after_idle(lambda: self.after(1, self._start_service))
 
-    def _build_log_menu(self):
-        self.menu = tk.Menu(self, tearoff=0)
-        self.menu.add_command(label='重播此則', command=self._ctx_replay)
-        self.menu.add_command(label='複製選取', command=lambda: self.txt_log.event_generate('<<Copy>>'))
-        self.menu.add_separator()
-        self.menu.add_command(label='刪除此則', command=self._ctx_delete)
-        self.txt_log.bind('<Button-3>', self._on_log_right_click)
+    def _start_service(self):
+        try:
+            self.proc = subprocess.Popen(
+                _service_command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                text=True, bufsize=1, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+        except Exception as e:
+            messagebox.showerror("初始化失敗", f"無法啟動語音服務：\n{e}")
+        if self.proc:
+            threading.Thread(target=self._read_service, daemon=True).start()
+            self._awaiting_ready = True
+            if self._initial_probe:
+                self._send({'cmd': 'voices'})
+                self._probing = True
+                self._set_status('掃描語者中…')
+            self._start_ui_poll()
+
+    def _send(self, cmd: dict):
+        if not self.proc or self.proc.poll() is not None:
+            return
+        try:
+            self.proc.stdin.write(json.dumps(cmd) + '\n')
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            pass
+
+    def _read_service(self):
+        # reader thread: keeps draining the service's stdout for as long as it
+        # lives, so emit() never blocks on a full pipe; never touches Tk
+        for line in self.proc.stdout:
+            try:
+                self._post_ui('service', json.loads(line))
+            except ValueError:
+                pass
+        self._post_ui('service', {'event': 'exit'})
+
+    def _on_service_event(self, evt: dict):
+        kind = evt.get('event')
+        if kind == 'ready':
+            self._awaiting_ready = False
+            self._service_key = evt.get('cache_key') or ''
+            # cached voices came from another OS/pyttsx3 version: re-probe
+            if self._cache_key is not None and self._cache_key != self._service_key and not self._probing:
+                self._send({'cmd': 'voices'})
+                self._probing = True
+        elif kind == 'voices':
+            self._probing = False
+            self._apply_voices(evt)
+        elif kind == 'error' and evt.get('cmd') == 'voices':
+            # startup probe or rescan failed; keep whatever voices we had
+            self._probing = False
+            self._initial_probe = False
+            messagebox.showerror('掃描語者失敗', evt.get('message', ''))
+            if not self._speaking:
+                self._set_status('待命')
+        elif kind in ('done', 'stopped', 'error') and evt.get('id') == self.current_say_id:
+            self._speaking = False
+            self._say_in_flight = False
+            if kind == 'error':
+                messagebox.showerror('朗讀失敗', evt.get('message', ''))
+            self._set_status('待命')
+        elif kind == 'fatal':
+            messagebox.showerror("初始化失敗", f"無法初始化系統語音：\n{evt.get('message', '')}")
+        elif kind == 'exit':
+            self._awaiting_ready = False
+            self._speaking = False
+            self._say_in_flight = False
+            self._probing = False
+            self._set_status('語音服務已結束')
 
     def destroy(self):
         try:
-            self.stop_speaking(join=True)
+            self._send({'cmd': 'stop'})
+            self._send({'cmd': 'quit'})
+            if self.proc:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=1.0)
         except Exception:
-            pass
+            if self.proc:
+                self.proc.kill()
         super().destroy()
 
 if __name__ == '__main__':
+    if '--tts-service' in sys.argv[1:]:
+        import tts_service
+        tts_service.main()
+        sys.exit(0)
     app = ChatTTSApp()
     app.mainloop()
@@ -0,0 +1,216 @@
+"""
+TTS service process for the Chat-Style TTS Panel
+- Owns one persistent pyttsx3 engine, isolated from the GUI process
+- Reads one JSON command per line on stdin:
+    {"cmd": "say", "id": 1, "text": "...", "voice": "...", "rate": 180, "vol": 1.0}
+    {"cmd": "stop"}      stop the current utterance and drop queued ones
+    {"cmd": "voices"}    report installed voices and engine defaults
+    {"cmd": "quit"}
+- Writes one JSON status line per event on stdout:
+    ready (with "cache_key") / voices / started / done / stopped / error / fatal
+  ("error" carries the failed say's "id", or "cmd": "voices" for a failed probe)
+"""
+import json
+import sys
+import platform
+import importlib.metadata
+import threading
+import queue
+import time
+
+
+def emit(event: str, **fields):
+    fields['event'] = event
+    sys.stdout.write(json.dumps(fields) + '\n')
+    sys.stdout.flush()
+
+
+def _languages(voice) -> list[str]:
+    # SAPI5 can report languages as raw bytes (e.g. b'\x04\x04'), which JSON can't carry
+    return [l.decode('latin1', errors='ignore') if isinstance(l, bytes) else str(l)
+            for l in (getattr(voice, 'languages', None) or [])]
+
+
+def _cache_key(pyttsx3) -> str:
+    # the GUI keys its voice cache on this; computed here so the GUI never
+    # pays for a package-metadata lookup before its first paint
+    try:
+        version = importlib.metadata.version('pyttsx3')
+    except Exception:
+        version = getattr(pyttsx3, '__version__', '')
+    return f'{sys.platform}|{platform.release()}|pyttsx3 {version}'
+
+
+def _uses_driver_loop(engine) -> bool:
+    # nsss's iterate() only flips busy off and yields; it never runs the
+    # NSRunLoop, so finished-utterance would never fire under startLoop(False)
+    try:
+        module = type(engine.proxy._driver).__module__
+    except Exception:
+        return sys.platform == 'darwin'
+    return module.rsplit('.', 1)[-1] == 'nsss'
+
+
+class SpeechService:
+    def __init__(self):
+        self.engine = None
+        self.jobs: queue.Queue = queue.Queue()
+        # highest "say" id received / cancelled so far; read by the engine loop
+        self._last_say_id = 0
+        self._stop_upto = 0
+        # last values pushed to the engine; skip setProperty when unchanged
+        self._engine_voice_id: str | None = None
+        self._engine_rate: int | None = None
+        self._engine_volume: float | None = None
+        # nsss (macOS) has no pumpable iterate(); it speaks via runAndWait()
+        self._driver_loop = False
+        self._current: dict | None = None
+
+    # -------------------- stdin reader --------------------
+    def _read_commands(self):
+        for line in sys.stdin:
+            try:
+                cmd = json.loads(line)
+            except ValueError:
+                continue
+            kind = cmd.get('cmd')
+            if kind == 'say':
+                self._last_say_id = int(cmd.get('id', 0))
+                self.jobs.put(cmd)
+            elif kind == 'stop':
+                self._stop_upto = self._last_say_id
+            elif kind == 'quit':
+                break
+            else:
+                self.jobs.put(cmd)
+        # stdin closed (parent gone) or quit requested
+        self._stop_upto = self._last_say_id
+        self.jobs.put(None)
+
+    def _cancelled(self, job: dict) -> bool:
+        return int(job.get('id', 0)) <= self._stop_upto
+
+    # -------------------- engine loop --------------------
+    def run(self):
+        try:
+            import pyttsx3  # imported here so driver/COM set-up errors are reported as 'fatal'
+            self.engine = pyttsx3.init()
+            self._driver_loop = _uses_driver_loop(self.engine)
+            if self._driver_loop:
+                self.engine.connect('started-word', self._on_word)
+            else:
+                self.engine.startLoop(False)
+        except Exception as e:
+            emit('fatal', message=str(e))
+            return
+        threading.Thread(target=self._read_commands, daemon=True).start()
+        emit('ready', cache_key=_cache_key(pyttsx3))
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                kind = job.get('cmd')
+                if kind == 'say':
+                    self._speak(job)
+                elif kind == 'voices':
+                    self._report_voices()
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        # end the external loop and release the driver explicitly instead of
+        # leaving SAPI/NSSS objects to garbage collection at interpreter exit
+        try:
+            self.engine.stop()
+            self.engine.endLoop()
+        except Exception:
+            pass
+        try:
+            self.engine.proxy._driver.destroy()
+        except Exception:
+            pass
+        self.engine = None
+
+    def _report_voices(self):
+        try:
+            voices = self.engine.getProperty('voices') or []
+            emit('voices',
+                 voices=[{'id': v.id,
+                          'name': getattr(v, 'name', None) or v.id,
+                          'languages': _languages(v)}
+                         for v in voices],
+                 rate=self.engine.getProperty('rate'),
+                 volume=self.engine.getProperty('volume'))
+        except Exception as e:
+            emit('error', cmd='voices', message=str(e))
+
+    def _apply_properties(self, voice_id: str | None, rate: int, volume: float):
+        if voice_id and voice_id != self._engine_voice_id:
+            try:
+                self.engine.setProperty('voice', voice_id)
+                self._engine_voice_id = voice_id
+            except Exception:
+                pass
+        if rate != self._engine_rate:
+            try:
+                self.engine.setProperty('rate', int(rate))
+                self._engine_rate = rate
+            except Exception:
+                pass
+        if volume != self._engine_volume:
+            try:
+                self.engine.setProperty('volume', float(volume))
+                self._engine_volume = volume
+            except Exception:
+                pass
+
+    def _speak(self, job: dict):
+        job_id = job.get('id', 0)
+        if self._cancelled(job):
+            emit('stopped', id=job_id)
+            return
+        try:
+            self._apply_properties(job.get('voice'), int(job.get('rate', 180)), float(job.get('vol', 1.0)))
+            emit('started', id=job_id)
+            self.engine.say(job.get('text', ''))
+            if self._driver_loop:
+                self._current = job
+                try:
+                    self.engine.runAndWait()
+                finally:
+                    self._current = None
+                emit('stopped' if self._cancelled(job) else 'done', id=job_id)
+                return
+            while self.engine.isBusy():
+                if self._cancelled(job):
+                    self.engine.stop()
+                    self._drain(timeout=0.5)
+                    emit('stopped', id=job_id)
+                    return
+                self.engine.iterate()
+                time.sleep(0.01)
+            emit('done', id=job_id)
+        except Exception as e:
+            emit('error', id=job_id, message=str(e))
+
+    def _on_word(self, name, location, length):
+        # driver-loop path: cancellation is checked at each word boundary
+        job = self._current
+        if job is not None and self._cancelled(job):
+            self.engine.stop()
+
+    def _drain(self, timeout: float):
+        # let the driver deliver its finish notification after stop()
+        deadline = time.monotonic() + timeout
+        while self.engine.isBusy() and time.monotonic() < deadline:
+            self.engine.iterate()
+            time.sleep(0.01)
+
+
+def main():
+    SpeechService().run()
+
+
+if __name__ == '__main__':
+    main()